@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 import sqlite3
 import os
+import sys
 import shutil
 import time
 import stat
@@ -8,6 +9,53 @@ import subprocess
 import logging
 from pathlib import Path
 import tempfile
+import threading
+import queue
+from contextlib import contextmanager
+from functools import lru_cache
+from itertools import islice
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# Number of imported entries per transaction when writing to Chrome history
+COMMIT_BATCH_SIZE = 10000
+# Number of new URLs inserted into Chrome history per executemany() call
+INSERT_BATCH_SIZE = 500
+# Number of Safari history rows processed at a time
+READ_BATCH_SIZE = 1000
+
+# Column and row separators for the sqlite3 command-line output
+UNIT_SEPARATOR = '\x1f'
+RECORD_SEPARATOR = '\x1e'
+
+# Safari uses seconds since 2001-01-01, Chrome uses microseconds since 1601-01-01
+SAFARI_EPOCH = 978307200  # 2001-01-01 in Unix time (seconds from 1970-01-01)
+CHROME_EPOCH_OFFSET = 11644473600  # Seconds between 1601-01-01 and 1970-01-01
+SAFARI_TO_CHROME_OFFSET = SAFARI_EPOCH + CHROME_EPOCH_OFFSET  # Seconds between 1601-01-01 and 2001-01-01
+
+# Statements for inserting into Chrome history. Every import path adds visits
+# through SELECT_MAX_URL_ID_SQL and INSERT_NEW_VISITS_SQL. The batched and
+# one-at-a-time inserts run INSERT_URL_SQL, while the attached-database import
+# fills the same URL_COLUMNS from a SELECT.
+SELECT_MAX_URL_ID_SQL = "SELECT COALESCE(MAX(id), 0) FROM urls"
+URL_COLUMNS = "url, title, visit_count, typed_count, last_visit_time, hidden"
+INSERT_URL_SQL = f"""
+    INSERT INTO urls ({URL_COLUMNS})
+    VALUES (?, ?, 1, 0, ?, 0)
+"""
+# Adds one visit for every URL whose ID is above the given one
+INSERT_NEW_VISITS_SQL = """
+    INSERT INTO visits (url, visit_time, transition, visit_duration, is_known_to_sync, 
+                    consider_for_ntp_most_visited, visited_link_id)
+    SELECT id, last_visit_time, 805306368, 0, 1, 1, 0
+    FROM urls
+    WHERE id > ?
+"""
+
+logger = logging.getLogger(__name__)
 
 # Set up logging to file
 def setup_logging():
@@ -20,7 +68,7 @@ def setup_logging():
         filemode='w'
     )
     # Create console handler with a higher log level
-    console = logging.StreamHandler()
+    console = logging.StreamHandler(sys.stdout)
     console.setLevel(logging.INFO)
     console_formatter = logging.Formatter('%(message)s')
     console.setFormatter(console_formatter)
@@ -81,7 +129,6 @@ def select_chrome_profile():
     
     if not profiles:
         logging.error("No Chrome profiles found. Please ensure Chrome is installed.")
-        print("No Chrome profiles found. Please ensure Chrome is installed.")
         return None
     
     print("\nAvailable Chrome profiles:")
@@ -116,34 +163,85 @@ def select_chrome_profile():
         except (ValueError, IndexError):
             print("Invalid selection. Please try again.")
 
-def check_file_permissions(file_path):
-    """Check file permissions and print detailed information."""
+def find_running_processes(names):
+    """Find running processes whose name contains any of the given names.
+    
+    Returns a dict mapping each name to a list of matching process IDs.
+    """
+    running = {name: [] for name in names}
+    
+    if psutil is not None:
+        # A single pass over the process table covers every name
+        try:
+            for process in psutil.process_iter(['pid', 'name']):
+                process_name = process.info['name'] or ''
+                for name in names:
+                    if name in process_name:
+                        running[name].append(str(process.info['pid']))
+            return running
+        except Exception as e:
+            logging.error(f"Could not list running processes with psutil: {e}")
+    
+    # Fall back to one pgrep call per name
+    for name in names:
+        try:
+            result = subprocess.run(["pgrep", name], capture_output=True, text=True)
+            if result.stdout.strip():
+                running[name] = result.stdout.strip().split('\n')
+        except Exception as e:
+            logging.error(f"Could not check if {name} is running: {e}")
+    
+    return running
+
+@lru_cache(maxsize=None)
+def get_user_name(uid):
+    """Look up a user name, caching the result across calls."""
+    import pwd
+    return pwd.getpwuid(uid).pw_name
+
+@lru_cache(maxsize=None)
+def get_group_name(gid):
+    """Look up a group name, caching the result across calls."""
+    import grp
+    return grp.getgrgid(gid).gr_name
+
+def safe_stat(file_path):
+    """Stat a file, returning None instead of raising if it does not exist."""
+    try:
+        return os.stat(file_path)
+    except FileNotFoundError:
+        return None
+
+def check_file_permissions(file_path, st=None):
+    """Check file permissions and print detailed information.
+    
+    Pass the result of an earlier safe_stat() call as st to avoid statting the file again.
+    """
     try:
-        if not os.path.exists(file_path):
+        # Get file stats
+        if st is None:
+            st = safe_stat(file_path)
+        if st is None:
             return f"File does not exist: {file_path}"
         
-        # Get file stats
-        st = os.stat(file_path)
         permissions = stat.filemode(st.st_mode)
         owner_uid = st.st_uid
         group_gid = st.st_gid
         
         # Try to get owner and group names
-        import pwd
-        import grp
         try:
-            owner_name = pwd.getpwuid(owner_uid).pw_name
+            owner_name = get_user_name(owner_uid)
         except KeyError:
             owner_name = f"UID: {owner_uid}"
         
         try:
-            group_name = grp.getgrgid(group_gid).gr_name
+            group_name = get_group_name(group_gid)
         except KeyError:
             group_name = f"GID: {group_gid}"
         
         # Check if the current user can read the file
         current_uid = os.getuid()
-        current_user = pwd.getpwuid(current_uid).pw_name
+        current_user = get_user_name(current_uid)
         
         can_read = os.access(file_path, os.R_OK)
         
@@ -169,16 +267,17 @@ def check_database_status(db_path):
     if not os.path.exists(db_path):
         return "File does not exist"
     
-    # Check if the database is valid
+    # Check if the database is valid. quick_check skips the costly index
+    # cross-checks of integrity_check, which is plenty for a fresh copy.
     try:
         result = subprocess.run(
-            ["sqlite3", str(db_path), "PRAGMA integrity_check;"],
+            ["sqlite3", str(db_path), "PRAGMA quick_check;"],
             capture_output=True, text=True
         )
         if "ok" in result.stdout.lower():
-            logging.debug("Database integrity check passed")
+            logging.debug("Database quick check passed")
         else:
-            logging.warning(f"Database integrity check failed: {result.stdout}")
+            logging.warning(f"Database quick check failed: {result.stdout}")
         
         # Try to get the list of tables
         tables_result = subprocess.run(
@@ -194,127 +293,136 @@ def check_database_status(db_path):
         logging.error(f"Error checking database: {e}")
         return f"Error checking database: {e}"
 
-def extract_safari_history_with_sqlite3(safari_path, limit=0):
-    """Extract Safari history using SQLite3 command-line tool."""
+def read_delimited_records(stream, separator, block_size=65536):
+    """Yield separator-terminated records from a text stream, one block at a time."""
+    pending = ''
+    for block in iter(lambda: stream.read(block_size), ''):
+        records = (pending + block).split(separator)
+        pending = records.pop()
+        yield from records
+    if pending:
+        yield pending
+
+def extract_safari_history_with_sqlite3(safari_db_path, limit=0):
+    """Extract Safari history from a database copy using SQLite3 command-line tool.
+    
+    This is a generator: rows are yielded while sqlite3 is still writing them,
+    so the full history is never held in memory.
+    """
     try:
-        # Create a temporary directory for our work
-        with tempfile.TemporaryDirectory() as temp_dir:
-            temp_db_path = os.path.join(temp_dir, "safari_history_temp.db")
-            
-            # Copy the database to our temporary location
-            logging.info(f"Copying Safari history database...")
-            logging.debug(f"Copying Safari history database to {temp_db_path}...")
-            shutil.copy2(safari_path, temp_db_path)
-            
-            # Make it readable
-            os.chmod(temp_db_path, 0o644)
-            
-            # Check if the copy was successful
-            if not os.path.exists(temp_db_path):
-                logging.error("Failed to copy Safari database")
-                return None
-                
-            # Check if the database is valid
-            check_database_status(temp_db_path)
-            
-            # Prepare the SQL query - limiting if needed
-            limit_clause = f"LIMIT {limit}" if limit > 0 else ""
-            sql_query = f"""
-            SELECT hi.id, hi.url, hv.visit_time, hv.title
-            FROM history_items hi
-            JOIN history_visits hv ON hi.id = hv.history_item
-            WHERE hi.url IS NOT NULL
-            ORDER BY hv.visit_time DESC
-            {limit_clause};
-            """
-            
-            # Create a script file for sqlite3
-            sql_script_path = os.path.join(temp_dir, "extract_query.sql")
-            with open(sql_script_path, 'w') as f:
-                f.write(sql_query)
-            
-            # Create an output file
-            output_path = os.path.join(temp_dir, "results.csv")
-            
-            # Run the SQL query and save results in CSV format
-            result = subprocess.run(
-                ["sqlite3", "-csv", temp_db_path, f".read {sql_script_path}"],
-                capture_output=True, text=True
-            )
-            
-            if result.returncode != 0:
-                logging.error(f"Error executing SQLite query: {result.stderr}")
-                # Try a different command structure
-                try:
-                    # First, check what tables exist
-                    table_result = subprocess.run(
-                        ["sqlite3", temp_db_path, ".tables"],
-                        capture_output=True, text=True
-                    )
-                    logging.debug(f"Tables in database: {table_result.stdout}")
-                    
-                    # Try a simpler query
-                    simple_query = "SELECT * FROM history_items LIMIT 5;"
-                    simple_result = subprocess.run(
-                        ["sqlite3", temp_db_path, simple_query],
-                        capture_output=True, text=True
-                    )
-                    if simple_result.returncode == 0 and simple_result.stdout:
-                        logging.debug("Simple query succeeded, adjusting approach...")
-                    else:
-                        logging.error(f"Simple query failed: {simple_result.stderr}")
-                except Exception as e:
-                    logging.error(f"Error with fallback query: {e}")
-                return None
-            
-            # Parse the CSV output
-            import csv
-            from io import StringIO
-            
-            # Process the output as CSV
-            reader = csv.reader(StringIO(result.stdout))
-            history_entries = []
-            
-            for row in reader:
+        # Check if the database is valid
+        check_database_status(safari_db_path)
+        
+        # Prepare the SQL query - limiting if needed
+        limit_clause = f"LIMIT {limit}" if limit > 0 else ""
+        sql_query = f"""
+        SELECT hi.id, hi.url, hv.visit_time, hv.title
+        FROM history_items hi
+        JOIN history_visits hv ON hi.id = hv.history_item
+        WHERE hi.url IS NOT NULL
+        ORDER BY hv.visit_time DESC
+        {limit_clause};
+        """
+        
+        # Create a script file for sqlite3
+        sql_script_path = os.path.join(os.path.dirname(safari_db_path), "extract_query.sql")
+        with open(sql_script_path, 'w') as f:
+            f.write(sql_query)
+        
+        # Run the SQL query and stream the results. ASCII unit/record separators
+        # never occur in URLs or titles, so no CSV quoting is needed.
+        process = subprocess.Popen(
+            ["sqlite3", "-separator", UNIT_SEPARATOR, "-newline", RECORD_SEPARATOR,
+             safari_db_path, f".read {sql_script_path}"],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE
+        )
+        
+        # Parse the output as it arrives instead of buffering all of it
+        import io
+        
+        entry_count = 0
+        try:
+            output = io.TextIOWrapper(process.stdout, encoding='utf-8', errors='replace', newline='')
+            for record in read_delimited_records(output, RECORD_SEPARATOR):
+                row = record.split(UNIT_SEPARATOR, 3)
                 if len(row) >= 4:  # We expect at least 4 columns
-                    history_entries.append((row[0], row[1], row[2], row[3]))
-            
-            logging.info(f"Extracted {len(history_entries)} entries from Safari history")
-            logging.debug(f"Extracted {len(history_entries)} entries using sqlite3 command-line")
-            
-            # Log a few entries as samples
-            if history_entries:
-                logging.debug("\nSample entries:")
-                for i, entry in enumerate(history_entries[:3]):
-                    logging.debug(f"Entry {i+1}: ID={entry[0]}, URL={entry[1]}, Time={entry[2]}, Title={entry[3]}")
+                    entry = (row[0], row[1], row[2], row[3])
+                    
+                    # Log a few entries as samples
+                    if entry_count == 0:
+                        logger.debug("\nSample entries:")
+                    if entry_count < 3:
+                        logger.debug("Entry %d: ID=%s, URL=%s, Time=%s, Title=%s", entry_count + 1, *entry)
+                    
+                    entry_count += 1
+                    yield entry
             
-            return history_entries
+            stderr = process.stderr.read().decode('utf-8', errors='replace')
+            returncode = process.wait()
+        finally:
+            # Stop sqlite3 if the consumer stopped reading early
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+        
+        if returncode != 0:
+            logging.error(f"Error executing SQLite query: {stderr}")
+            # Try a different command structure
+            try:
+                # First, check what tables exist
+                table_result = subprocess.run(
+                    ["sqlite3", safari_db_path, ".tables"],
+                    capture_output=True, text=True
+                )
+                logging.debug(f"Tables in database: {table_result.stdout}")
+                
+                # Try a simpler query
+                simple_query = "SELECT * FROM history_items LIMIT 5;"
+                simple_result = subprocess.run(
+                    ["sqlite3", safari_db_path, simple_query],
+                    capture_output=True, text=True
+                )
+                if simple_result.returncode == 0 and simple_result.stdout:
+                    logging.debug("Simple query succeeded, adjusting approach...")
+                else:
+                    logging.error(f"Simple query failed: {simple_result.stderr}")
+            except Exception as e:
+                logging.error(f"Error with fallback query: {e}")
+            return
+        
+        logging.info(f"Extracted {entry_count} entries from Safari history")
+        logging.debug(f"Extracted {entry_count} entries using sqlite3 command-line")
     except Exception as e:
         logging.error(f"Error extracting Safari history with sqlite3: {e}")
-        return None
 
-def copy_safari_database_and_extract(safari_path, limit=0):
-    """Create a copy of the Safari database and extract history."""
+def copy_safari_database(safari_path, temp_dir):
+    """Copy the Safari database into temp_dir and return the copy's path."""
     try:
-        # Create a temporary directory for our work
-        temp_dir = tempfile.mkdtemp(prefix="safari_migration_")
         temp_db_path = os.path.join(temp_dir, "safari_history_temp.db")
         
         logging.info(f"Copying Safari history database...")
         logging.debug(f"Copying Safari history database to {temp_db_path}...")
-        shutil.copy2(safari_path, temp_db_path)
+        shutil.copyfile(safari_path, temp_db_path)
         
         # Set permissions to make sure it's readable and writable
         os.chmod(temp_db_path, 0o644)
         
         # Check if the file was copied successfully
-        if not os.path.exists(temp_db_path):
+        copy_stat = safe_stat(temp_db_path)
+        if copy_stat is None:
             logging.error("Failed to copy Safari database")
             return None
         
         # Print information about the copied file
-        check_file_permissions(temp_db_path)
-        
+        check_file_permissions(temp_db_path, copy_stat)
+        return temp_db_path
+    except Exception as e:
+        logging.error(f"Error in copy_safari_database: {e}")
+        return None
+
+def check_safari_database(temp_db_path):
+    """Check a Safari database copy in-process and return the path to import from."""
+    try:
         # Connect to the copied database
         logging.debug("Connecting to copied Safari database...")
         try:
@@ -322,26 +430,27 @@ def copy_safari_database_and_extract(safari_path, limit=0):
             conn = sqlite3.connect(temp_db_path, timeout=5)
             cursor = conn.cursor()
             
-            # Check if the connection works
+            # Check if the connection works, using the cheaper quick_check on the fresh copy
             try:
-                cursor.execute("PRAGMA integrity_check;")
+                cursor.execute("PRAGMA quick_check;")
                 result = cursor.fetchone()
                 if result and result[0] == "ok":
-                    logging.debug("Database integrity check passed")
+                    logging.debug("Database quick check passed")
                 else:
-                    logging.warning(f"Database integrity check failed: {result}")
+                    logging.warning(f"Database quick check failed: {result}")
             except sqlite3.OperationalError as e:
                 logging.error(f"Error checking database integrity: {e}")
                 # Try to force database recovery
                 try:
                     logging.debug("Attempting database recovery...")
-                    recovery_path = os.path.join(temp_dir, "recovered.db")
+                    recovery_path = os.path.join(os.path.dirname(temp_db_path), "recovered.db")
                     cursor.execute(f"VACUUM INTO '{recovery_path}';")
                     
                     # Close and reopen with the recovered database
                     conn.close()
                     conn = sqlite3.connect(recovery_path)
                     cursor = conn.cursor()
+                    temp_db_path = recovery_path
                     logging.debug("Recovery completed")
                 except Exception as recovery_error:
                     logging.error(f"Recovery failed: {recovery_error}")
@@ -351,62 +460,357 @@ def copy_safari_database_and_extract(safari_path, limit=0):
             cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
             tables = cursor.fetchall()
             logging.debug(f"Tables found: {[table[0] for table in tables]}")
+            conn.close()
             
             # Check if we have the expected tables
             if not any('history_' in table[0] for table in tables):
                 logging.error("No history tables found - database might be corrupted or empty")
                 return None
             
-            # Query the database for history entries
-            query = """
-            SELECT hi.id, hi.url, hv.visit_time, hv.title
-            FROM history_items hi
-            JOIN history_visits hv ON hi.id = hv.history_item
-            WHERE hi.url IS NOT NULL
-            ORDER BY hv.visit_time DESC
-            """
-            
-            # Add limit if specified
-            if limit > 0:
-                query += f" LIMIT {limit}"
-            
-            cursor.execute(query)
-            history_entries = cursor.fetchall()
-            
-            logging.info(f"Extracted {len(history_entries)} entries from Safari history")
-            logging.debug(f"Extracted {len(history_entries)} entries from copied database")
-            
-            # Show a sample of the entries
-            if history_entries:
-                logging.debug("\nSample entries:")
-                for i, entry in enumerate(history_entries[:3]):
-                    logging.debug(f"Entry {i+1}: ID={entry[0]}, URL={entry[1]}, Time={entry[2]}, Title={entry[3]}")
-            
-            conn.close()
-            return history_entries
+            return temp_db_path
             
         except sqlite3.OperationalError as e:
             logging.error(f"Error connecting to copied database: {e}")
-            # Fall back to command line sqlite3
-            logging.debug("Falling back to sqlite3 command-line tool...")
-            return extract_safari_history_with_sqlite3(temp_db_path, limit)
+            return None
             
     except Exception as e:
-        logging.error(f"Error in copy_safari_database_and_extract: {e}")
+        logging.error(f"Error in check_safari_database: {e}")
         return None
+
+def convert_safari_times(visit_times):
+    """Convert a column of Safari visit times to Chrome timestamps in one pass."""
+    visit_times = list(visit_times)
+    try:
+        # Fast path: every value is numeric (or a numeric string from the CSV export)
+        return [int((float(visit_time) + SAFARI_TO_CHROME_OFFSET) * 1000000)
+                for visit_time in visit_times]
+    except (ValueError, TypeError):
+        pass
+    
+    # Slow path: convert one by one and fall back to the current time for bad values
+    fallback_time = int((time.time() + CHROME_EPOCH_OFFSET) * 1000000)
+    chrome_times = []
+    for visit_time in visit_times:
+        try:
+            chrome_times.append(int((float(visit_time) + SAFARI_TO_CHROME_OFFSET) * 1000000))
+        except (ValueError, TypeError) as e:
+            logger.error("Error converting visit time %r: %s", visit_time, e)
+            chrome_times.append(fallback_time)
+    return chrome_times
+
+def drop_history_indexes(chrome_cursor):
+    """Drop the non-unique indexes on Chrome's urls and visits tables.
+    
+    Returns the CREATE INDEX statements needed to rebuild them.
+    """
+    # Automatic indexes have no SQL and UNIQUE ones enforce constraints, so both stay
+    chrome_cursor.execute("""
+        SELECT name, sql FROM main.sqlite_master
+        WHERE type = 'index' AND tbl_name IN ('urls', 'visits')
+        AND sql IS NOT NULL AND sql NOT LIKE 'CREATE UNIQUE%'
+    """)
+    indexes = chrome_cursor.fetchall()
+    
+    for name, _ in indexes:
+        chrome_cursor.execute(f'DROP INDEX main."{name}"')
+    logger.debug("Dropped indexes for the import: %s", [name for name, _ in indexes])
+    
+    return [sql for _, sql in indexes]
+
+def rebuild_history_indexes(chrome_cursor, index_statements):
+    """Recreate the indexes dropped by drop_history_indexes."""
+    logger.debug("Rebuilding %d indexes...", len(index_statements))
+    for sql in index_statements:
+        chrome_cursor.execute(sql)
+
+@contextmanager
+def visits_for_new_urls(chrome_cursor):
+    """Add one visit for every URL inserted into Chrome history inside the block.
+    
+    No visits are added if the block raises.
+    """
+    # Chrome URL IDs only ever grow, so the new rows are the ones above the current maximum
+    chrome_cursor.execute(SELECT_MAX_URL_ID_SQL)
+    last_url_id = chrome_cursor.fetchone()[0]
+    
+    yield
+    
+    # Insert visit information for the new URLs without reading their IDs back
+    chrome_cursor.execute(INSERT_NEW_VISITS_SQL, (last_url_id,))
+
+def insert_history_rows(chrome_cursor, url_batch, failed_urls):
+    """Insert new URLs and their visits into Chrome history one at a time.
+    
+    Used to replay a batch that failed as a whole. URLs that fail on their own are
+    logged and added to failed_urls. Returns the number of URLs inserted.
+    """
+    inserted_count = 0
+    
+    for url_entry in url_batch:
+        chrome_cursor.execute("SAVEPOINT url_row")
+        try:
+            with visits_for_new_urls(chrome_cursor):
+                chrome_cursor.execute(INSERT_URL_SQL, url_entry)
+            chrome_cursor.execute("RELEASE url_row")
+        except sqlite3.Error as sql_error:
+            logger.error("Error inserting URL %s: %s", url_entry[0], sql_error)
+            chrome_cursor.execute("ROLLBACK TO url_row")
+            chrome_cursor.execute("RELEASE url_row")
+            failed_urls.add(url_entry[0])
+            continue
+        
+        inserted_count += 1
+    
+    return inserted_count
+
+def insert_history_batch(chrome_cursor, url_batch, failed_urls):
+    """Insert a batch of new URLs and their visits into Chrome history.
+    
+    url_batch holds (url, title, chrome_time) tuples. If the batch fails, it is
+    replayed one URL at a time so only the failing URLs are lost; those are added
+    to failed_urls. Returns the number of URLs inserted.
+    """
+    # Run the batch in a savepoint so a failure leaves no half-inserted rows behind
+    chrome_cursor.execute("SAVEPOINT url_batch")
+    try:
+        with visits_for_new_urls(chrome_cursor):
+            chrome_cursor.executemany(INSERT_URL_SQL, url_batch)
+        inserted_count = len(url_batch)
+    except sqlite3.Error as sql_error:
+        logger.error("Error inserting batch of %d URLs, retrying one at a time: %s",
+                     len(url_batch), sql_error)
+        chrome_cursor.execute("ROLLBACK TO url_batch")
+        inserted_count = insert_history_rows(chrome_cursor, url_batch, failed_urls)
+    
+    chrome_cursor.execute("RELEASE url_batch")
+    return inserted_count
+
+def prepend_row(first_row, rows):
+    """Yield first_row followed by rows, closing rows when this generator is closed."""
+    try:
+        yield first_row
+        yield from rows
     finally:
-        # Clean up
-        if 'temp_dir' in locals() and os.path.exists(temp_dir):
+        rows.close()
+
+def prefetch_in_background(rows, chunk_size=READ_BATCH_SIZE, max_chunks=16):
+    """Iterate rows on a background thread while the caller consumes them.
+    
+    Rows are handed over in chunks through a bounded queue, so reading Safari
+    history overlaps with writing Chrome history instead of alternating with it.
+    When the caller stops early, the reader stops too and closes rows.
+    """
+    chunks = queue.Queue(maxsize=max_chunks)
+    finished = object()
+    stop = threading.Event()
+    
+    def hand_over(item):
+        # Keep checking for the stop signal instead of blocking on a full queue
+        while not stop.is_set():
             try:
-                shutil.rmtree(temp_dir)
-            except Exception as e:
-                logging.error(f"Error cleaning up temporary directory: {e}")
+                chunks.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+    
+    def produce():
+        rows_iter = iter(rows)
+        try:
+            for chunk in iter(lambda: list(islice(rows_iter, chunk_size)), []):
+                if not hand_over(chunk):
+                    return
+            hand_over(finished)
+        except Exception as e:
+            # Hand the error over so it is raised in the consuming thread
+            hand_over(e)
+        finally:
+            # Let the source run its own cleanup, such as stopping the sqlite3 process
+            if hasattr(rows_iter, 'close'):
+                rows_iter.close()
+    
+    producer = threading.Thread(target=produce, name="safari-history-reader", daemon=True)
+    producer.start()
+    
+    try:
+        while True:
+            chunk = chunks.get()
+            if chunk is finished:
+                break
+            if isinstance(chunk, Exception):
+                raise chunk
+            yield from chunk
+    finally:
+        # Tell the reader to stop and free up the queue in case it is waiting on it
+        stop.set()
+        while True:
+            try:
+                chunks.get_nowait()
+            except queue.Empty:
+                break
+        producer.join()
+
+def iter_new_history_urls(safari_history, existing_urls, failed_urls, counts, verbose=False):
+    """Yield (url, title, chrome_time) for Safari entries whose URL is not in Chrome yet.
+    
+    Yielded URLs are added to existing_urls so later duplicates in this run are
+    skipped. Skipped entries are tallied in counts['skipped']; entries for URLs in
+    failed_urls are dropped without being counted.
+    """
+    safari_history = iter(safari_history)
+    queued_count = 0
+    # Checked once so disabled debug output costs nothing per row
+    debug_enabled = logger.isEnabledFor(logging.DEBUG)
+    
+    for chunk in iter(lambda: list(islice(safari_history, READ_BATCH_SIZE)), []):
+        # Convert the chunk's Safari visit times to Chrome's format in one pass
+        chrome_times = convert_safari_times(entry[2] for entry in chunk)
+        
+        for (safari_id, url, visit_time, title), chrome_time in zip(chunk, chrome_times):
+            # Skip empty URLs
+            if not url:
+                continue
+            
+            # Don't retry URLs that already failed to insert
+            if url in failed_urls:
+                continue
+            
+            # Check if URL already exists in Chrome (or is already queued for insert)
+            if url in existing_urls:
+                counts['skipped'] += 1
+                if verbose and debug_enabled:
+                    logger.debug("URL already exists in Chrome: %s", url)
+                continue
+            
+            # For debugging, formatting the readable time only in verbose mode
+            if debug_enabled:
+                if verbose:
+                    unix_time = chrome_time / 1000000 - CHROME_EPOCH_OFFSET
+                    safari_time_readable = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(unix_time))
+                    logger.debug("Safari time: %s → Unix time: %s (%s) → Chrome time: %s",
+                                 visit_time, unix_time, safari_time_readable, chrome_time)
+                elif queued_count < 5:
+                    logger.debug("Safari time: %s → Chrome time: %s", visit_time, chrome_time)
+            
+            existing_urls.add(url)
+            queued_count += 1
+            yield (url, title or '', chrome_time)
+
+def import_safari_history_rows(chrome_cursor, safari_history, limit=0, dry_run=False, verbose=False):
+    """Import extracted Safari history rows into Chrome in batches.
+    
+    safari_history can be any iterable of rows and is consumed lazily. Expects a
+    transaction to be open on chrome_cursor. Returns (imported_count, skipped_count).
+    """
+    imported_count = 0
+    uncommitted_count = 0
+    counts = {'skipped': 0}
+    
+    # Read Safari rows on a separate thread while this one inserts into Chrome
+    prefetched_history = prefetch_in_background(safari_history)
+    safari_history = prefetched_history
+    
+    # Apply limit if specified
+    if limit > 0:
+        safari_history = islice(safari_history, limit)
+    
+    logger.info("Processing entries...")
+    
+    # Load all existing Chrome URLs once instead of querying per entry
+    chrome_cursor.execute("SELECT url FROM urls")
+    existing_urls = {url for (url,) in chrome_cursor.fetchall()}
+    logger.debug("Loaded %d existing URLs from Chrome history", len(existing_urls))
+    failed_urls = set()
+    
+    # Pull new URLs from the generator one executemany() batch at a time
+    new_urls = iter_new_history_urls(safari_history, existing_urls, failed_urls, counts, verbose)
+    try:
+        for url_batch in iter(lambda: list(islice(new_urls, INSERT_BATCH_SIZE)), []):
+            inserted_count = insert_history_batch(chrome_cursor, url_batch, failed_urls)
+            imported_count += inserted_count
+            uncommitted_count += inserted_count
+            
+            # Commit in large batches to limit journal flushes
+            if uncommitted_count >= COMMIT_BATCH_SIZE and not dry_run:
+                chrome_cursor.execute("COMMIT")
+                chrome_cursor.execute("BEGIN")
+                uncommitted_count = 0
+            
+            if not dry_run:
+                logger.info("Imported %d entries so far...", imported_count)
+            else:
+                logger.info("Would import %d entries (dry run)", imported_count)
+    finally:
+        # Stop the reader thread even if the import stopped early
+        prefetched_history.close()
+    
+    return imported_count, counts['skipped']
+
+def import_attached_safari_history(chrome_cursor, limit=0):
+    """Import history from the Safari database attached as 'safari' entirely in SQL.
+    
+    URL deduplication and time conversion run inside SQLite, so no rows pass
+    through Python. Expects a transaction to be open on chrome_cursor.
+    Returns (imported_count, skipped_count).
+    """
+    # Same selection as the row-by-row import: most recent visits first, optionally limited
+    safari_visits = """
+        SELECT hi.url AS url, hv.visit_time AS visit_time, hv.title AS title
+        FROM safari.history_items hi
+        JOIN safari.history_visits hv ON hi.id = hv.history_item
+        WHERE hi.url IS NOT NULL AND hi.url != ''
+        ORDER BY hv.visit_time DESC
+        LIMIT ?
+    """
+    row_limit = limit if limit > 0 else -1
+    
+    chrome_cursor.execute(f"""
+        SELECT COUNT(*), COALESCE(SUM(typeof(visit_time) NOT IN ('real', 'integer')), 0)
+        FROM ({safari_visits})
+    """, (row_limit,))
+    total_entries, invalid_time_count = chrome_cursor.fetchone()
+    logger.info("Processing %d entries...", total_entries)
+    
+    # Like the row-by-row import, fall back to the current time for non-numeric visit times
+    fallback_time = int((time.time() + CHROME_EPOCH_OFFSET) * 1000000)
+    if invalid_time_count:
+        logger.error("Found %d visits with a non-numeric visit time, using the current time for them",
+                     invalid_time_count)
+    
+    with visits_for_new_urls(chrome_cursor):
+        # One row per new URL, taken from its most recent visit. SQLite fills the
+        # bare title column from the row holding MAX(visit_time).
+        chrome_cursor.execute(f"""
+            INSERT INTO urls ({URL_COLUMNS})
+            SELECT url, COALESCE(title, ''), 1, 0,
+                   CASE WHEN typeof(visit_time) IN ('real', 'integer')
+                        THEN CAST((visit_time + ?) * 1000000 AS INTEGER)
+                        ELSE ? END,
+                   0
+            FROM (
+                SELECT url, MAX(visit_time) AS visit_time, title
+                FROM ({safari_visits})
+                GROUP BY url
+            )
+            WHERE url NOT IN (SELECT url FROM main.urls WHERE url IS NOT NULL)
+        """, (SAFARI_TO_CHROME_OFFSET, fallback_time, row_limit))
+        imported_count = chrome_cursor.rowcount
+    
+    return imported_count, total_entries - imported_count
 
 def main():
     # Initialize count variables before any exceptions can occur
     imported_count = 0
     skipped_count = 0
     
+    # Initialize resources checked during cleanup
+    args = None
+    chrome_conn = None
+    safari_temp_dir = None
+    temp_chrome_path = None
+    chrome_backup_path = None
+    import_completed = False
+    
     # Setup logging
     log_file = setup_logging()
     logging.info(f"Safari to Chrome history migration started. Logs will be saved to {log_file}")
@@ -427,63 +831,49 @@ def main():
             chrome_history_path = select_chrome_profile()
             if not chrome_history_path:
                 logging.error("No Chrome profile selected. Exiting.")
-                print("No Chrome profile selected. Exiting.")
                 return
         
         # Print file information
         logging.info(f"Safari history path: {safari_history_path}")
         logging.info(f"Chrome history path: {chrome_history_path}")
         
-        # Check if files exist
-        if not safari_history_path.exists():
+        # Check if files exist, keeping the stat results for the permission report
+        safari_history_stat = safe_stat(safari_history_path)
+        if safari_history_stat is None:
             logging.error(f"Safari history file not found at {safari_history_path}")
-            print(f"ERROR: Safari history file not found at {safari_history_path}")
             return
         
-        if not chrome_history_path.exists():
+        chrome_history_stat = safe_stat(chrome_history_path)
+        if chrome_history_stat is None:
             logging.error(f"Chrome history file not found at {chrome_history_path}")
-            print(f"ERROR: Chrome history file not found at {chrome_history_path}")
             return
         
         # Print file permissions
         logging.debug("\n--- Safari History File Permissions ---")
-        logging.debug(check_file_permissions(safari_history_path))
+        logging.debug(check_file_permissions(safari_history_path, safari_history_stat))
         logging.debug("\n--- Chrome History File Permissions ---")
-        logging.debug(check_file_permissions(chrome_history_path))
+        logging.debug(check_file_permissions(chrome_history_path, chrome_history_stat))
         
         # Check for running browsers
         logging.info("\nChecking for running browser processes...")
         
+        running_processes = find_running_processes(["Safari", "Chrome"])
+        
         # Check Safari
-        safari_running = False
-        try:
-            safari_process = subprocess.run(["pgrep", "Safari"], capture_output=True, text=True)
-            if safari_process.stdout.strip():
-                logging.warning("Safari appears to be running.")
-                safari_pids = safari_process.stdout.strip().split('\n')
-                logging.debug(f"Safari process IDs: {safari_pids}")
-                safari_running = True
-                print("⚠️ Safari appears to be running.")
-        except Exception as e:
-            logging.error(f"Could not check if Safari is running: {e}")
+        safari_running = bool(running_processes["Safari"])
+        if safari_running:
+            logging.warning("Safari appears to be running.")
+            logging.debug(f"Safari process IDs: {running_processes['Safari']}")
         
         # Check Chrome
-        chrome_running = False
-        try:
-            chrome_process = subprocess.run(["pgrep", "Chrome"], capture_output=True, text=True)
-            if chrome_process.stdout.strip():
-                logging.warning("Chrome appears to be running.")
-                chrome_pids = chrome_process.stdout.strip().split('\n')
-                logging.debug(f"Chrome process IDs: {chrome_pids}")
-                chrome_running = True
-                print("⚠️ Chrome appears to be running.")
-        except Exception as e:
-            logging.error(f"Could not check if Chrome is running: {e}")
+        chrome_running = bool(running_processes["Chrome"])
+        if chrome_running:
+            logging.warning("Chrome appears to be running.")
+            logging.debug(f"Chrome process IDs: {running_processes['Chrome']}")
         
         # Warn if browsers are running
         if safari_running or chrome_running:
             logging.warning("One or more browsers appear to be running.")
-            print("\n⚠️ WARNING: One or more browsers appear to be running.")
             print("This may cause issues with database access or result in incomplete migration.")
             proceed = input("Do you want to proceed anyway? (yes/no): ")
             if proceed.lower() != 'yes':
@@ -499,7 +889,6 @@ def main():
             shutil.copy2(chrome_history_path, chrome_backup_path)
         except Exception as e:
             logging.error(f"Failed to create Chrome history backup: {e}")
-            print(f"ERROR: Failed to create Chrome history backup: {e}")
             return
         
         # Copy Chrome history to a temporary file
@@ -509,183 +898,166 @@ def main():
             shutil.copy2(chrome_history_path, temp_chrome_path)
         except PermissionError:
             logging.error("Cannot access Chrome history file. Chrome might be running.")
-            print("ERROR: Cannot access Chrome history file. Chrome might be running.")
             print("Please close Chrome completely and try again.")
             return
         except Exception as e:
             logging.error(f"Could not copy Chrome history: {e}")
-            print(f"ERROR: Could not copy Chrome history: {e}")
             return
         
         # Extract Safari history data using the appropriate method
         logging.info("Extracting Safari history data...")
         safari_history = None
+        safari_db_copy = None
+        
+        # A single copy of the Safari database serves every extraction method
+        safari_temp_dir = tempfile.TemporaryDirectory(prefix="safari_migration_")
+        safari_copy_path = copy_safari_database(safari_history_path, safari_temp_dir.name)
         
-        if args.library_mode:
+        if safari_copy_path and args.library_mode:
             logging.debug("Using sqlite3 command-line tool as requested...")
-            safari_history = extract_safari_history_with_sqlite3(safari_history_path, args.limit)
-        else:
+            safari_history = extract_safari_history_with_sqlite3(safari_copy_path, args.limit)
+        elif safari_copy_path:
             logging.debug("Using database copy method...")
-            safari_history = copy_safari_database_and_extract(safari_history_path, args.limit)
+            safari_db_copy = check_safari_database(safari_copy_path)
+            if not safari_db_copy:
+                # Fall back to command line sqlite3
+                logging.debug("Falling back to sqlite3 command-line tool...")
+                safari_history = extract_safari_history_with_sqlite3(safari_copy_path, args.limit)
+        
+        if safari_history is not None:
+            # Rows are streamed, so peek at the first one to tell an empty or failed extraction
+            first_entry = next(safari_history, None)
+            if first_entry is not None:
+                safari_history = prepend_row(first_entry, safari_history)
+            else:
+                safari_history = None
         
-        if not safari_history:
+        if not safari_db_copy and not safari_history:
             logging.error("Failed to extract Safari history data. Cannot proceed with migration.")
-            print("Failed to extract Safari history data. Cannot proceed with migration.")
             return
         
-        logging.info(f"Successfully extracted {len(safari_history)} history entries from Safari")
-        
         # Connect to Chrome history database
         logging.info("Connecting to Chrome history database...")
-        chrome_conn = sqlite3.connect(temp_chrome_path)
+        # Disable implicit transactions so the import runs in explicit ones
+        chrome_conn = sqlite3.connect(temp_chrome_path, isolation_level=None)
         chrome_cursor = chrome_conn.cursor()
         
+        # Tune the connection for bulk inserts. The temporary copy is discarded
+        # if anything goes wrong, so syncing to disk can be skipped entirely.
+        # Nothing else opens the copy, so the file lock is taken once and kept
+        # (set before WAL so no shared-memory index is needed). The journal
+        # itself stays on: dry runs and failed batches rely on ROLLBACK.
+        chrome_cursor.execute("PRAGMA journal_mode")
+        original_journal_mode = chrome_cursor.fetchone()[0]
+        chrome_cursor.executescript("""
+            PRAGMA locking_mode=EXCLUSIVE;
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=OFF;
+            PRAGMA cache_size=-65536;
+            PRAGMA temp_store=MEMORY;
+            PRAGMA mmap_size=268435456;
+        """)
+        
         # Process and insert data into Chrome
         logging.info("Processing and inserting data into Chrome...")
         
-        # Dictionary to map Safari URL IDs to Chrome URL IDs
-        url_id_mapping = {}
-        
-        # Apply limit if specified
-        if args.limit > 0 and len(safari_history) > args.limit:
-            safari_history = safari_history[:args.limit]
-            logging.info(f"Limiting import to {args.limit} entries")
+        if safari_db_copy:
+            # Let SQLite move the rows across directly from the attached Safari copy
+            chrome_cursor.execute("ATTACH DATABASE ? AS safari", (safari_db_copy,))
+            chrome_cursor.executescript("""
+                PRAGMA safari.cache_size=-65536;
+                PRAGMA safari.mmap_size=268435456;
+            """)
         
-        total_entries = len(safari_history)
-        logging.info(f"Processing {total_entries} entries...")
+        chrome_cursor.execute("BEGIN")
         
-        for safari_id, url, visit_time, title in safari_history:
-            # Skip empty URLs
-            if not url:
-                continue
-                
-            # Check if URL already exists in Chrome
-            chrome_cursor.execute("SELECT id FROM urls WHERE url = ?", (url,))
-            existing_url = chrome_cursor.fetchone()
-            
-            if existing_url:
-                # URL exists, use existing ID
-                chrome_url_id = existing_url[0]
-                url_id_mapping[safari_id] = chrome_url_id
-                skipped_count += 1
-                if args.verbose:
-                    logging.debug(f"URL already exists in Chrome: {url}")
-            else:
-                # URL doesn't exist, insert it
-                # Convert Safari's visit_time to Chrome's format
-                # Safari uses seconds since 2001-01-01, Chrome uses microseconds since 1601-01-01
-                safari_epoch = 978307200  # 2001-01-01 in Unix time (seconds from 1970-01-01)
-                chrome_epoch_offset = 11644473600  # Seconds between 1601-01-01 and 1970-01-01
-                
-                # First convert Safari time to Unix timestamp (seconds since 1970-01-01)
-                try:
-                    # Try to convert visit_time to float/int if it's a string
-                    if isinstance(visit_time, str):
-                        visit_time = float(visit_time)
-                    
-                    unix_time = safari_epoch + float(visit_time)
-                    
-                    # Then convert to Chrome time (microseconds since 1601-01-01)
-                    chrome_time = int((unix_time + chrome_epoch_offset) * 1000000)  # Convert to microseconds
-                except (ValueError, TypeError) as e:
-                    logging.error(f"Error converting time for URL {url}: {e}")
-                    # Use current time as fallback
-                    chrome_time = int((time.time() + chrome_epoch_offset) * 1000000)
-                
-                # For debugging
-                if imported_count < 5 or args.verbose:
-                    safari_time_readable = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(unix_time))
-                    logging.debug(f"Safari time: {visit_time} → Unix time: {unix_time} ({safari_time_readable}) → Chrome time: {chrome_time}")
-                
-                # Insert new URL into Chrome
-                try:
-                    chrome_cursor.execute("""
-                        INSERT INTO urls (url, title, visit_count, typed_count, last_visit_time, hidden)
-                        VALUES (?, ?, 1, 0, ?, 0)
-                    """, (url, title or '', chrome_time))
-                    
-                    chrome_url_id = chrome_cursor.lastrowid
-                    url_id_mapping[safari_id] = chrome_url_id
-                    
-                    # Insert visit information
-                    chrome_cursor.execute("""
-                        INSERT INTO visits (url, visit_time, transition, visit_duration, is_known_to_sync, 
-                                        consider_for_ntp_most_visited, visited_link_id)
-                        VALUES (?, ?, 805306368, 0, 1, 1, 0)
-                    """, (chrome_url_id, chrome_time))
-                    
-                    imported_count += 1
-                    
-                    # Commit every 100 entries to avoid large transactions
-                    if imported_count % 100 == 0 and not args.dry_run:
-                        chrome_conn.commit()
-                        logging.info(f"Imported {imported_count} entries so far...")
-                    elif imported_count % 100 == 0 and args.dry_run:
-                        logging.info(f"Would import {imported_count} entries (dry run)")
-                except sqlite3.Error as sql_error:
-                    logging.error(f"Error inserting URL {url}: {sql_error}")
-                    continue
+        # Indexes are cheaper to build once after the import than to update on every insert.
+        # A failed import discards the temporary copy, so they are only rebuilt on success.
+        # A dry run rolls everything back, so it leaves the indexes alone.
+        dropped_indexes = drop_history_indexes(chrome_cursor) if not args.dry_run else []
+        if safari_db_copy:
+            imported_count, skipped_count = import_attached_safari_history(chrome_cursor, args.limit)
+        else:
+            imported_count, skipped_count = import_safari_history_rows(
+                chrome_cursor, safari_history, args.limit, args.dry_run, args.verbose)
+        if dropped_indexes:
+            rebuild_history_indexes(chrome_cursor, dropped_indexes)
         
         # Commit remaining changes
         if not args.dry_run:
-            chrome_conn.commit()
+            chrome_cursor.execute("COMMIT")
             logging.info(f"Successfully imported {imported_count} entries from Safari to Chrome")
             logging.info(f"Skipped {skipped_count} entries (already in Chrome history)")
         else:
+            chrome_cursor.execute("ROLLBACK")
             logging.info(f"Dry run completed. Would have imported {imported_count} entries")
             logging.info(f"Skipped {skipped_count} entries (already in Chrome history)")
         
+        if safari_db_copy:
+            chrome_cursor.execute("DETACH DATABASE safari")
+        
+        # WAL mode is persistent, restore the original mode before Chrome sees the file
+        chrome_cursor.execute(f"PRAGMA journal_mode={original_journal_mode}")
+        logging.debug(f"Chrome history journal mode restored to: {chrome_cursor.fetchone()[0]}")
+        import_completed = True
+        
     except Exception as e:
-        logging.error(f'Error: {e}')
+        logger.error('Error: %s', e)
         import traceback
         error_traceback = traceback.format_exc()
-        logging.error(f"An error occurred:\n{error_traceback}")
-        print(f'Error: {e}')
+        logger.error("An error occurred:\n%s", error_traceback)
         print("Check the log file for more details.")
         
-        if 'chrome_backup_path' in locals() and os.path.exists(chrome_backup_path):
-            logging.info("Restoring Chrome history from backup...")
+        if chrome_backup_path is not None:
             try:
                 shutil.copy2(chrome_backup_path, chrome_history_path)
-                logging.info("Chrome history backup restored.")
+                logger.info("Chrome history restored from backup.")
             except Exception as restore_error:
-                logging.error(f"Error restoring backup: {restore_error}")
+                logger.error("Error restoring backup: %s", restore_error)
         
     finally:
         # Close connections
-        if 'chrome_conn' in locals() and chrome_conn:
+        if chrome_conn is not None:
             chrome_conn.close()
         
+        # Clean up the Safari database copy
+        if safari_temp_dir is not None:
+            try:
+                safari_temp_dir.cleanup()
+            except Exception as e:
+                logger.error("Error cleaning up temporary directory: %s", e)
+        
         # Replace Chrome history with our modified version
-        if 'temp_chrome_path' in locals() and os.path.exists(temp_chrome_path) and imported_count > 0 and not args.dry_run:
+        if import_completed and imported_count > 0 and not args.dry_run:
             # Chrome must not be running for this to work
-            logging.info("Preparing to replace Chrome history with updated version...")
+            logger.info("Preparing to replace Chrome history with updated version...")
             print("NOTE: Make sure Chrome is completely closed before confirming.")
             confirm = input("Is Chrome closed? (yes/no): ")
             
             if confirm.lower() == 'yes':
                 try:
                     shutil.copy2(temp_chrome_path, chrome_history_path)
-                    logging.info("Chrome history successfully updated.")
+                    logger.info("Chrome history successfully updated.")
                 except Exception as e:
-                    logging.error(f"Error updating Chrome history: {e}")
-                    print(f"Error updating Chrome history: {e}")
+                    logger.error("Error updating Chrome history: %s", e)
                     print("Chrome might still be running. Close it completely and try again.")
             else:
-                logging.info("Operation cancelled by user. Chrome history not updated.")
-        elif 'args' in locals() and args.dry_run:
-            logging.info("Dry run mode - not updating Chrome history file.")
-            print("Dry run mode - not updating Chrome history file.")
+                logger.info("Operation cancelled by user. Chrome history not updated.")
+        elif args is not None and args.dry_run:
+            logger.info("Dry run mode - not updating Chrome history file.")
         
         # Clean up temporary file
-        if 'temp_chrome_path' in locals() and os.path.exists(temp_chrome_path):
+        if temp_chrome_path is not None:
             try:
-                os.remove(temp_chrome_path)
-                logging.debug("Temporary Chrome history file removed.")
-            except Exception as e:
-                logging.error(f"Error removing temporary Chrome history file: {e}")
+                os.unlink(temp_chrome_path)
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Temporary Chrome history file removed.")
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.error("Error removing temporary Chrome history file: %s", e)
             
-        if 'chrome_backup_path' in locals() and os.path.exists(chrome_backup_path):
-            logging.info(f"Done. Original Chrome history backup is at: {chrome_backup_path}")
+        if chrome_backup_path is not None and os.path.exists(chrome_backup_path):
+            logger.info("Done. Original Chrome history backup is at: %s", chrome_backup_path)
 if __name__ == "__main__":
     main()